@@ -44,7 +44,12 @@ chrome.runtime.onMessage.addListener(async (msg) => {
       };
 
       websocket.onmessage = (e) => {
-        chrome.runtime.sendMessage({ type: 'UI_UPDATE', payload: JSON.parse(e.data) }).catch(() => {});
+        // Server batches messages into a JSON array per frame
+        const parsed = JSON.parse(e.data);
+        const messages = Array.isArray(parsed) ? parsed : [parsed];
+        for (const payload of messages) {
+          chrome.runtime.sendMessage({ type: 'UI_UPDATE', payload }).catch(() => {});
+        }
       };
 
       // 3. Re-wire the transcription path
@@ -62,10 +67,8 @@ chrome.runtime.onMessage.addListener(async (msg) => {
           const rms = Math.sqrt(sum / input.length);
 
           if (rms>0.005){
-            websocket.send(JSON.stringify({
-                type: 'audio',
-                data: btoa(String.fromCharCode(...new Uint8Array(input.buffer)))
-            }));
+            // Raw Float32 samples as a binary frame: no base64/JSON overhead
+            websocket.send(input.buffer);
           }
         }
       };
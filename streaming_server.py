@@ -1,328 +1,450 @@
-#!/usr/bin/env python3
-"""
-Reliable sentence-level transcription for browser tab audio
-No VAD, no silence detection, no partial hallucinations
-"""
-
-import asyncio, websockets, json, base64, os, tempfile, wave, time, traceback, librosa, sherpa_onnx
-import soundfile as sf
-from datetime import datetime
-from pathlib import Path
-import numpy as np
-
-# ================= CONFIG =================
-MODEL_DIR = r"C:\sherpa_models\sherpa-onnx-whisper-tiny.en"
-HOST, PORT = "localhost", 8765
-
-SAMPLE_RATE = 16000
-SAMPLE_WIDTH = 2
-
-DECODE_INTERVAL_SECONDS = 6.0      # sentence-sized chunks
-OVERLAP_SECONDS = 1.0              # keep context
-# =========================================
-
-
-# ---------- Load Whisper ----------
-def discover(md):
-    md = Path(md)
-    return (
-        next(md.glob("*tokens*.txt")),
-        next(md.glob("*encoder*.onnx")),
-        next(md.glob("*decoder*.onnx")),
-    )
-
-tokens, encoder, decoder = discover(MODEL_DIR)
-
-recognizer = sherpa_onnx.OfflineRecognizer.from_whisper(
-    encoder=str(encoder),
-    decoder=str(decoder),
-    tokens=str(tokens),
-)
-
-print("✔ Whisper model loaded")
-
-
-# ---------- Decode ----------
-def decode_pcm(pcm):
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-        with wave.open(f.name, "wb") as w:
-            w.setnchannels(1)
-            w.setsampwidth(SAMPLE_WIDTH)
-            w.setframerate(SAMPLE_RATE)
-            w.writeframes(pcm)
-
-    audio, sr = sf.read(f.name, dtype="float32")
-    os.remove(f.name)
-
-    stream = recognizer.create_stream()
-    stream.accept_waveform(sr, audio)
-    recognizer.decode_stream(stream)
-    return stream.result.text.strip()
-
-
-# ---------- WebSocket ----------
-async def handle(ws):
-    buffer = bytearray()
-    last_decode_time = time.time()
-    # Default fallback if metadata is missed
-    input_sample_rate = 44100 
-
-    print("🟢 Client connected")
-
-    async for msg in ws:
-        data = json.loads(msg)
-
-        if data.get("type") == "metadata":
-            input_sample_rate = data.get("sampleRate", 44100)
-            print(f"📡 Hardware Sample Rate detected: {input_sample_rate}Hz")
-            continue
-
-        if data.get("type") != "audio":
-            continue
-
-        # 1. Decode base64 back to raw bytes
-        raw_bytes = base64.b64decode(data["data"])
-        
-        # 2. Interpret bytes as 32-bit floats (matching JS Float32Array)
-        audio_floats = np.frombuffer(raw_bytes, dtype=np.float32)
-        
-        # 3. Resample from hardware rate to Whisper's 16000Hz
-        if input_sample_rate != SAMPLE_RATE:
-            audio_resampled = librosa.resample(
-                audio_floats, 
-                orig_sr=input_sample_rate, 
-                target_sr=SAMPLE_RATE
-            )
-        else:
-            audio_resampled = audio_floats
-
-        # 4. Perform float-to-int16 conversion on the server
-        audio_int16 = (np.clip(audio_resampled, -1.0, 1.0) * 32767).astype(np.int16)
-        
-        # 5. Extend buffer with the processed bytes
-        buffer.extend(audio_int16.tobytes())
-
-        now = time.time()
-        duration = len(buffer) / (SAMPLE_RATE * SAMPLE_WIDTH)
-
-        if now - last_decode_time >= DECODE_INTERVAL_SECONDS and duration >= 2.0:
-            text = decode_pcm(buffer) # Existing whisper decode logic
-
-            # keep overlap
-            keep = int(OVERLAP_SECONDS * SAMPLE_RATE * SAMPLE_WIDTH)
-            buffer = buffer[-keep:]
-
-            last_decode_time = now
-
-            if text:
-                await ws.send(json.dumps({
-                    "type": "transcription",
-                    "text": text,
-                    "timestamp": datetime.now().isoformat()
-                }))
-                asyncio.create_task(send_transcripts_to_llm_and_print(text, websocket=ws))
-                
-async def send_transcripts_to_llm_and_print(
-    transcripts,
-    websocket=None,
-    model: str | None = None,
-    max_tokens: int = 600,
-    temperature: float = 0.0
-) -> str | None:
-    """
-    Autonomous Technical Strategist: Detects intent, fills technical gaps,
-    and provides generative blueprints instead of basic definitions.
-    """
-
-    # 1. Normalize and validate input
-    if not transcripts:
-        return None
-    if isinstance(transcripts, (list, tuple)):
-        combined = "\n".join(str(t).strip() for t in transcripts if t)
-    else:
-        combined = str(transcripts).strip()
-
-    if not combined:
-        return None
-    meetingType="Behavioral Interview"
-    knownInfo="Python"
-    knownProjects="Project using API and Kafka"
-    # 2. Enhanced Autonomous Prompt
-    prompt = f"""
-You are a highly-informed **Domain Expert Architect** and **Knowledge Enhancement Engine**.
-Your task is to analyze rolling slices of a transcript, fuse them, and provide generative technical insights.
-
-### PHASE 1: TRANSCRIPT ANALYSIS
-1. **Sentence Fusion:** Combine transcript slices into complete, meaningful sentences. Since the transcriptions might be for non native users 
-check and correct the words as needed to have a meaningful sentence. 
-for example: 
-Transcript: "Understanding underlying concepts helped me use tools like Catchy B.T. and Google B.R."
-Meaning: "Understanding underlying concepts helped me use tools like ChatGPT and Google Bard"
-that is use the phonetic similarity to find meaniingful sentence rather than the normal typing similarity.
-
-2. **Sentence Priority:** Give the LAST sentence the highest priority. Extract keywords and intent primarily from the most recent speech.
-"""
-    #Meeting type declation
-    if meetingType=="unknown":
-        prompt+=f"""
-3. **Archetype Detection:** Automatically detect if the setting is a **Technical Interview**, **Product/Tech Review**, **Educational Lecture** or **Generic conversation/meeting**."""
-    else:
-        prompt+=f"""3. Since the setting type is confirmed to be """+meetingType+f""" then perfrom all the next steps based on this assumption"""
-    #knownInfo declaration
-    if len(knownInfo)>0:
-        prompt+=f"""
-4. **Known Info:** You can assume that the user already knows the following skills information, thus all context generation should be done with assumption.
-for example: A person skilled in python and react facing a technical interview question should be given prompts in Python and react itself rather than C++ or Java.
-Similarly an civil engineer might not need to know the definition of a load bearing column due to having prior professional information but might need help with API definition.
-Thus all context generated should have their complexity decided by the knowledge reserve already avialable to the user. The known skills &information are as follows """+knownInfo
-        if len(knownProjects)>0:
-            prompt+=f""" Additionally remember to include the following projects into the generated context when applicable. 
-            For example in system design and behavioral interviews. 
-            """+ knownProjects
-    
-    prompt +=f"""
-
-### PHASE 2: CONTEXT GENERATION (THE STRATEGIST)
-Based on the detected setting, generate the "context" field using the most appropriate of the following rules. 
-If a specific rule is not applicable then do not hallucinate or fake the data. If multiple settings are applicable then use the most
-suitable rules for the current conversation to generate the context and arrange the context in a logical format.
-Try to avoid repeating a context which has already been generated for this conversation.  
-
-- **IF TECHNICAL INTERVIEW:**
-  - Provide a "Professional Opening" to help the user start their answer.
-  - Provide 3-4 "Mastery Keywords" (architectural patterns or edge cases).
-  - Provide a [STAR] or [System Design] generic template to fill with experience.
-  - If confirmed to be a DSA type interview then ignore real-world analogies. Focus on DSA to solve the problem.
-  - Avoid repeating "STAR method" if already mentioned. 
-  
-- **IF BEHAVIORAL INTERVIEW:**
-  - If the user drifts into irrelevant stories, provide a warning.
-  - If user has provided projects completed by themselves then try to answer interview questions with those projects when possible.
-  - Differentiate between 'how to act' and 'what to say'. Always prioritize 'what to say'.
-  - Provide specific feedback on the content of the user's current answer which will help the user refine their answer.
-  - Act as a critical coach. If the interviewee goes off-topic or uses a flawed logic (e.g., brute force for a large scale problem), 
-  gently provide a 'Hint' or 'Correction' in the context box to steer them back.
-  
-- **IF PRODUCT/TECH REVIEW:**
-  - Provide a "Comparative Analysis" (how this feature compares to industry standards or old versions).
-  - Provide a concise lists of Pros/Cons.
-
-- **IF LECTURES/EDUCATIONAL:**
-  - Provide "Memory Refresh" that is prerequisite logic/knowledge in concise format and/or valid Markdown links to access such knowledge.
-    i.e. it should be of the format <a href="www.example.com"> example </a>
-  - Provide valid Markdown links to official docs (MDN, AWS, etc.) for clickable deep-dives.
-  - All links should be valid Markdown links in clickable format. i.e. it should be of the format <a href="www.example.com"> example </a>
-so that the link can be directly clicked by the user so as to open the link in the background while the meeting/video is still ongoing.
-
-
-If the conversation can be several of the above categories then mix and match the context provided as appropriate. 
-You may use the below given options to enhnace the context
-- If an keyword, API or tool is mentioned, do not just define it. Provide a generic boilerplate construction (e.g., a sample REST payload or code snippet).
-- Explain one specific way the discussed logic fails under 10x load or suggest possible optimization.
-- Identify what the speaker *didn't* mention but should have (e.g., indexing, security, or scaling).
-
-### PHASE 3: 
-- Remember that the context provided will change as the conversation continues so the context should be consice and helpful.
-- The context should not repeat information already explained in either the conversation or previous context.
-- The context should not include information like context generation strategies used by us. It should only provide information immediately
-helpful to the user.
-- If the context uses several different points the the points should be seperated into different paragraphs to make it easy to 
-read when displayed in HTML div text. 
-- Assume the context will be displayed as text in an HTML div, format the content accordingly.
-
-### CONSTRAINTS:
-- Return ONLY one JSON object with exactly one field: "context".
-- If no knowledge can be extracted (small talk), return {{"context": "No relevant context extracted"}}.
-- The links mentioned should be real links which can be accessed not fake links or placeholders.
-- All links should be valid Markdown links in clickable format. i.e. it should be of the format <a href="www.example.com"> example </a>
-so that the link can be directly clicked by the user so as to open the link in the background while the meeting/video is still ongoing.
-- The result context should be human readable and not include things like the settings, resources etc used for context generation.
-- Compare previously provided context to prevent repeat of same advice when possible.
-
-TRANSCRIPT:
-\"\"\"{combined}\"\"\"
-"""
-
-    model = model or os.environ.get("MODEL") or "gpt-4o-mini"
-
-    # 3. Setup OpenAI Client
-    try:
-        from openai import OpenAI
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            print("[LLM ERROR]: OPENAI_API_KEY not found in environment.")
-            return None
-        client = OpenAI()
-    except Exception as e:
-        print(f"[LLM ERROR]: {e}")
-        return None
-
-    messages = [
-        {"role": "system", "content": "You are a Knowledge Enhancement Engine. You receive trancript of conversation and then provide"
-        " Output of exactly one JSON object with one key: context."},
-        {"role": "user", "content": prompt}
-    ]
-
-    try:
-        # 4. Threaded API call to prevent audio processing lag
-        resp = await asyncio.to_thread(
-            lambda: client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-        )
-        
-        # 5. Strict Extraction to prevent 'garbage' metadata results
-        raw_text = resp.choices[0].message.content.strip()
-
-        # Handle Markdown code blocks if LLM includes them
-        if raw_text.startswith("```"):
-            raw_text = raw_text.split("```")[1].replace("json", "").strip()
-
-        # Parse JSON and extract context
-        try:
-            parsed = json.loads(raw_text)
-            context_val = parsed.get("context", raw_text)
-        except json.JSONDecodeError:
-            context_val = raw_text
-
-    except Exception as e:
-        print(f"send_transcripts_to_llm_and_print failed: {e}")
-        return None
-
-    # 6. Final Data Assembly for UI
-    out_json = {
-        "context": str(context_val),
-        "model": model,
-        "generated_at": datetime.now().isoformat(),
-        "source_len": len(combined),
-    }
-
-    print("\n[LLM CONTEXT]:")
-    print(json.dumps(out_json, indent=2, ensure_ascii=False))
-
-    if websocket:
-        try:
-            await websocket.send(json.dumps({"type": "context_partial", "json": out_json}))
-        except Exception:
-            pass
-
-    return out_json["context"]
-
-async def main():
-    print("Started")
-    async with websockets.serve(
-        handle, 
-        HOST, 
-        PORT,
-        max_size=2**24,          # Increase max message size (16MB)
-        ping_interval=None,      # Disable ping to prevent timeout during heavy CPU load
-        ping_timeout=None
-    ):
-        print(f"Listening on ws://{HOST}:{PORT}")
-        await asyncio.Future()  # run forever
-
-if __name__ == "__main__":
-    asyncio.run(main())
+#!/usr/bin/env python3
+"""
+Reliable sentence-level transcription for browser tab audio
+No VAD, no silence detection, no partial hallucinations
+"""
+
+import asyncio, websockets, json, orjson, os, socket, time, traceback, sherpa_onnx
+from math import gcd
+from pathlib import Path
+import numba
+import numpy as np
+from scipy.signal import resample_poly
+
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    uvloop = None  # not available on Windows, fall back to default loop
+
+# ================= CONFIG =================
+MODEL_DIR = r"C:\sherpa_models\sherpa-onnx-whisper-tiny.en"
+HOST, PORT = "localhost", 8765
+
+SAMPLE_RATE = 16000
+BUFFER_SECONDS = 30                # preallocated float32 ring capacity
+
+DECODE_INTERVAL_SECONDS = 6.0      # sentence-sized chunks
+OVERLAP_SECONDS = 1.0              # keep context
+
+DEBUG = bool(os.environ.get("DEBUG"))  # verbose console dumps off the hot path
+# =========================================
+
+
+# ---------- Load Whisper ----------
+# Standard filenames inside a sherpa-onnx whisper-tiny.en dump; resolved
+# directly so startup doesn't need to list the directory
+TOKENS_FILE = "tiny.en-tokens.txt"
+ENCODER_FILE = "tiny.en-encoder.onnx"
+DECODER_FILE = "tiny.en-decoder.onnx"
+
+def discover(md):
+    md = Path(md)
+    tokens = md / TOKENS_FILE
+    encoder = md / ENCODER_FILE
+    decoder = md / DECODER_FILE
+    if tokens.exists() and encoder.exists() and decoder.exists():
+        return tokens, encoder, decoder
+    # Fallback glob for model dumps with non-standard names
+    return (
+        next(md.glob("*tokens*.txt")),
+        next(md.glob("*encoder*.onnx")),
+        next(md.glob("*decoder*.onnx")),
+    )
+
+tokens, encoder, decoder = discover(MODEL_DIR)
+
+# Leave two cores free for the event loop and the LLM worker thread so
+# the ORT pool doesn't oversubscribe the machine during decodes
+recognizer = sherpa_onnx.OfflineRecognizer.from_whisper(
+    encoder=str(encoder),
+    decoder=str(decoder),
+    tokens=str(tokens),
+    num_threads=max(1, (os.cpu_count() or 2) - 2),
+    provider="cpu",
+)
+
+print("✔ Whisper model loaded")
+
+
+# ---------- LLM client ----------
+# One client for the process lifetime so the underlying httpx pool and
+# TLS connection are reused across calls
+try:
+    from openai import OpenAI
+    _openai_client = OpenAI(timeout=30.0) if os.environ.get("OPENAI_API_KEY") else None
+except Exception as e:
+    print(f"[LLM ERROR]: {e}")
+    _openai_client = None
+
+
+# ---------- Decode ----------
+@numba.njit(cache=True, fastmath=True, boundscheck=False)
+def clip_into(x, out):
+    # Saturating clamp fused with the ring write; LLVM vectorizes the loop
+    for i in range(x.size):
+        v = x[i]
+        if v > 1.0:
+            v = 1.0
+        elif v < -1.0:
+            v = -1.0
+        out[i] = v
+
+
+def decode_audio(audio):
+    # audio is already float32 at SAMPLE_RATE, no conversion needed
+    stream = recognizer.create_stream()
+    stream.accept_waveform(SAMPLE_RATE, audio)
+    recognizer.decode_stream(stream)
+    return stream.result.text.strip()
+
+
+# Deploy-level context used to specialize the prompt
+MEETING_TYPE = "Behavioral Interview"
+KNOWN_INFO = "Python"
+KNOWN_PROJECTS = "Project using API and Kafka"
+
+
+def build_system_prompt():
+    """Assemble the static LLM instructions once; only the transcript changes per call."""
+    prompt = f"""
+You are a highly-informed **Domain Expert Architect** and **Knowledge Enhancement Engine**.
+Your task is to analyze rolling slices of a transcript, fuse them, and provide generative technical insights.
+
+### PHASE 1: TRANSCRIPT ANALYSIS
+1. **Sentence Fusion:** Combine transcript slices into complete, meaningful sentences. Since the transcriptions might be for non native users 
+check and correct the words as needed to have a meaningful sentence. 
+for example: 
+Transcript: "Understanding underlying concepts helped me use tools like Catchy B.T. and Google B.R."
+Meaning: "Understanding underlying concepts helped me use tools like ChatGPT and Google Bard"
+that is use the phonetic similarity to find meaniingful sentence rather than the normal typing similarity.
+
+2. **Sentence Priority:** Give the LAST sentence the highest priority. Extract keywords and intent primarily from the most recent speech.
+"""
+    #Meeting type declation
+    if MEETING_TYPE=="unknown":
+        prompt+=f"""
+3. **Archetype Detection:** Automatically detect if the setting is a **Technical Interview**, **Product/Tech Review**, **Educational Lecture** or **Generic conversation/meeting**."""
+    else:
+        prompt+=f"""3. Since the setting type is confirmed to be """+MEETING_TYPE+f""" then perfrom all the next steps based on this assumption"""
+    #KNOWN_INFO declaration
+    if len(KNOWN_INFO)>0:
+        prompt+=f"""
+4. **Known Info:** You can assume that the user already knows the following skills information, thus all context generation should be done with assumption.
+for example: A person skilled in python and react facing a technical interview question should be given prompts in Python and react itself rather than C++ or Java.
+Similarly an civil engineer might not need to know the definition of a load bearing column due to having prior professional information but might need help with API definition.
+Thus all context generated should have their complexity decided by the knowledge reserve already avialable to the user. The known skills &information are as follows """+KNOWN_INFO
+        if len(KNOWN_PROJECTS)>0:
+            prompt+=f""" Additionally remember to include the following projects into the generated context when applicable. 
+            For example in system design and behavioral interviews. 
+            """+ KNOWN_PROJECTS
+    
+    prompt +=f"""
+
+### PHASE 2: CONTEXT GENERATION (THE STRATEGIST)
+Based on the detected setting, generate the "context" field using the most appropriate of the following rules. 
+If a specific rule is not applicable then do not hallucinate or fake the data. If multiple settings are applicable then use the most
+suitable rules for the current conversation to generate the context and arrange the context in a logical format.
+Try to avoid repeating a context which has already been generated for this conversation.  
+
+- **IF TECHNICAL INTERVIEW:**
+  - Provide a "Professional Opening" to help the user start their answer.
+  - Provide 3-4 "Mastery Keywords" (architectural patterns or edge cases).
+  - Provide a [STAR] or [System Design] generic template to fill with experience.
+  - If confirmed to be a DSA type interview then ignore real-world analogies. Focus on DSA to solve the problem.
+  - Avoid repeating "STAR method" if already mentioned. 
+  
+- **IF BEHAVIORAL INTERVIEW:**
+  - If the user drifts into irrelevant stories, provide a warning.
+  - If user has provided projects completed by themselves then try to answer interview questions with those projects when possible.
+  - Differentiate between 'how to act' and 'what to say'. Always prioritize 'what to say'.
+  - Provide specific feedback on the content of the user's current answer which will help the user refine their answer.
+  - Act as a critical coach. If the interviewee goes off-topic or uses a flawed logic (e.g., brute force for a large scale problem), 
+  gently provide a 'Hint' or 'Correction' in the context box to steer them back.
+  
+- **IF PRODUCT/TECH REVIEW:**
+  - Provide a "Comparative Analysis" (how this feature compares to industry standards or old versions).
+  - Provide a concise lists of Pros/Cons.
+
+- **IF LECTURES/EDUCATIONAL:**
+  - Provide "Memory Refresh" that is prerequisite logic/knowledge in concise format and/or valid Markdown links to access such knowledge.
+    i.e. it should be of the format <a href="www.example.com"> example </a>
+  - Provide valid Markdown links to official docs (MDN, AWS, etc.) for clickable deep-dives.
+  - All links should be valid Markdown links in clickable format. i.e. it should be of the format <a href="www.example.com"> example </a>
+so that the link can be directly clicked by the user so as to open the link in the background while the meeting/video is still ongoing.
+
+
+If the conversation can be several of the above categories then mix and match the context provided as appropriate. 
+You may use the below given options to enhnace the context
+- If an keyword, API or tool is mentioned, do not just define it. Provide a generic boilerplate construction (e.g., a sample REST payload or code snippet).
+- Explain one specific way the discussed logic fails under 10x load or suggest possible optimization.
+- Identify what the speaker *didn't* mention but should have (e.g., indexing, security, or scaling).
+
+### PHASE 3: 
+- Remember that the context provided will change as the conversation continues so the context should be consice and helpful.
+- The context should not repeat information already explained in either the conversation or previous context.
+- The context should not include information like context generation strategies used by us. It should only provide information immediately
+helpful to the user.
+- If the context uses several different points the the points should be seperated into different paragraphs to make it easy to 
+read when displayed in HTML div text. 
+- Assume the context will be displayed as text in an HTML div, format the content accordingly.
+
+### CONSTRAINTS:
+- Return ONLY one JSON object with exactly one field: "context".
+- If no knowledge can be extracted (small talk), return {{"context": "No relevant context extracted"}}.
+- The links mentioned should be real links which can be accessed not fake links or placeholders.
+- All links should be valid Markdown links in clickable format. i.e. it should be of the format <a href="www.example.com"> example </a>
+so that the link can be directly clicked by the user so as to open the link in the background while the meeting/video is still ongoing.
+- The result context should be human readable and not include things like the settings, resources etc used for context generation.
+- Compare previously provided context to prevent repeat of same advice when possible.
+
+"""
+
+    return prompt
+
+
+SYSTEM_PROMPT = build_system_prompt()
+
+
+# ---------- WebSocket ----------
+async def batch_sender(ws, send_queue):
+    """Coalesce queued messages into one JSON-array frame per wakeup."""
+    while True:
+        batch = [await send_queue.get()]
+        while True:
+            try:
+                batch.append(send_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        # orjson returns bytes; decode so the client still gets a text frame
+        await ws.send(orjson.dumps(batch).decode())
+
+
+def make_resample_fn(rate):
+    """Bind the resampler once per connection: identity for 16 kHz input,
+    otherwise a polyphase resampler with precomputed up/down factors."""
+    if rate == SAMPLE_RATE:
+        return lambda x: x
+    g = gcd(SAMPLE_RATE, rate)
+    up, down = SAMPLE_RATE // g, rate // g
+    return lambda x: resample_poly(x, up, down)
+
+
+async def llm_worker(llm_queue, send_queue):
+    """Single consumer so at most one LLM call is in flight per connection."""
+    while True:
+        text = await llm_queue.get()
+        await send_transcripts_to_llm_and_print(text, send_queue=send_queue)
+
+
+async def handle(ws):
+    # Preallocated float32 ring: samples stay in Whisper's native format
+    # from resample to decode, no int16 round trip
+    buf = np.empty(SAMPLE_RATE * BUFFER_SECONDS, dtype=np.float32)
+    widx = 0
+    last_decode_time = time.time()
+    # Default fallback if metadata is missed
+    input_sample_rate = 44100
+    resample_fn = make_resample_fn(input_sample_rate)
+
+    # Outgoing messages funnel through one queue so transcription and
+    # context frames produced in the same cycle go out as a single send
+    send_queue = asyncio.Queue()
+    sender_task = asyncio.create_task(batch_sender(ws, send_queue))
+
+    # Transcripts for the LLM go through a bounded queue with one
+    # long-lived consumer instead of a new task per decode
+    llm_queue = asyncio.Queue(maxsize=1)
+    llm_task = asyncio.create_task(llm_worker(llm_queue, send_queue))
+
+    # Socket tuning for streaming: disable Nagle so small JSON replies
+    # aren't held back, and widen the kernel buffers for the audio feed
+    sock = ws.transport.get_extra_info("socket")
+    if sock is not None:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 << 20)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+
+    print("🟢 Client connected")
+
+    try:
+        while True:
+            try:
+                msg = await ws.recv()
+            except websockets.ConnectionClosed:
+                break
+
+            # Drain frames that already arrived so the resample and clamp
+            # below run once over a bigger chunk instead of per 20-50ms frame
+            pending = [msg]
+            while True:
+                try:
+                    pending.append(await asyncio.wait_for(ws.recv(), 0.001))
+                except (asyncio.TimeoutError, websockets.ConnectionClosed):
+                    break
+
+            # Text frames are JSON control messages (metadata etc.);
+            # audio arrives as binary frames of raw Float32 PCM
+            chunks = []
+            for msg in pending:
+                if not isinstance(msg, (bytes, bytearray)):
+                    data = orjson.loads(msg)
+
+                    if data.get("type") == "metadata":
+                        input_sample_rate = data.get("sampleRate", 44100)
+                        resample_fn = make_resample_fn(input_sample_rate)
+                        print(f"📡 Hardware Sample Rate detected: {input_sample_rate}Hz")
+                    continue
+
+                # 1. Interpret bytes as 32-bit floats (matching JS Float32Array)
+                chunks.append(np.frombuffer(msg, dtype=np.float32))
+
+            if not chunks:
+                continue
+
+            audio_floats = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+            # 2. Resample from hardware rate to Whisper's 16000Hz
+            audio_resampled = resample_fn(audio_floats)
+
+            # 3. Clip to valid range, writing straight into the ring (no temporaries)
+            n = audio_resampled.size
+            if widx + n > buf.size:
+                n = buf.size - widx  # ring full, drop the excess
+            clip_into(audio_resampled[:n], buf[widx:widx + n])
+            widx += n
+
+            now = time.time()
+            duration = widx / SAMPLE_RATE
+
+            if now - last_decode_time >= DECODE_INTERVAL_SECONDS and duration >= 2.0:
+                # Run the blocking ONNX decode on a worker thread (same pattern
+                # as the OpenAI call) so websocket I/O keeps flowing. The view
+                # is safe to hand over: this handler awaits the decode, so
+                # nothing writes to the ring until it returns
+                text = await asyncio.to_thread(decode_audio, buf[:widx])
+
+                # keep overlap
+                keep = int(OVERLAP_SECONDS * SAMPLE_RATE)
+                np.copyto(buf[:keep], buf[widx - keep:widx])
+                widx = keep
+
+                last_decode_time = now
+
+                if text:
+                    send_queue.put_nowait({
+                        "type": "transcription",
+                        "text": text,
+                        "timestamp": now  # epoch seconds; client renders its own clock
+                    })
+                    # Drop the stale transcript if the worker is still busy,
+                    # so the LLM always sees the freshest context
+                    if llm_queue.full():
+                        llm_queue.get_nowait()
+                    llm_queue.put_nowait(text)
+    finally:
+        sender_task.cancel()
+        llm_task.cancel()
+
+async def send_transcripts_to_llm_and_print(
+    transcripts,
+    send_queue=None,
+    model: str | None = None,
+    max_tokens: int = 600,
+    temperature: float = 0.0
+) -> str | None:
+    """
+    Autonomous Technical Strategist: Detects intent, fills technical gaps,
+    and provides generative blueprints instead of basic definitions.
+    """
+
+    # 1. Normalize and validate input
+    if not transcripts:
+        return None
+    if isinstance(transcripts, (list, tuple)):
+        combined = "\n".join(str(t).strip() for t in transcripts if t)
+    else:
+        combined = str(transcripts).strip()
+
+    if not combined:
+        return None
+
+    model = model or os.environ.get("MODEL") or "gpt-4o-mini"
+
+    # 2. Reuse the shared OpenAI client
+    if _openai_client is None:
+        print("[LLM ERROR]: OpenAI client unavailable (OPENAI_API_KEY not set?).")
+        return None
+    client = _openai_client
+
+    # 3. Static instructions go in the system message (OpenAI caches repeated
+    # system prefixes); only the fresh transcript is sent per call
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f'TRANSCRIPT:\n"""{combined}"""'}
+    ]
+
+    try:
+        # 4. Threaded API call to prevent audio processing lag
+        resp = await asyncio.to_thread(
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"},
+            )
+        )
+
+        # 5. Strict Extraction to prevent 'garbage' metadata results
+        raw_text = resp.choices[0].message.content.strip()
+
+        # Parse JSON and extract context (json_object mode guarantees no code fences)
+        try:
+            parsed = orjson.loads(raw_text)
+            context_val = parsed.get("context", raw_text)
+        except orjson.JSONDecodeError:
+            context_val = raw_text
+
+    except Exception as e:
+        print(f"send_transcripts_to_llm_and_print failed: {e}")
+        return None
+
+    # 6. Final Data Assembly for UI
+    out_json = {
+        "context": str(context_val),
+        "model": model,
+        "generated_at": time.time(),
+        "source_len": len(combined),
+    }
+
+    # Pretty-printing walks the dict twice and blocks on stdout; debug only
+    if DEBUG:
+        print("\n[LLM CONTEXT]:")
+        print(json.dumps(out_json, indent=2, ensure_ascii=False))
+
+    if send_queue:
+        try:
+            send_queue.put_nowait({"type": "context_partial", "json": out_json})
+        except Exception:
+            pass
+
+    return out_json["context"]
+
+async def main():
+    print("Started")
+    async with websockets.serve(
+        handle, 
+        HOST, 
+        PORT,
+        max_size=2**24,          # Increase max message size (16MB)
+        write_limit=2**20,       # Larger outgoing buffer before backpressure kicks in
+        compression=None,        # Audio payloads don't compress; skip the zlib pass
+        ping_interval=None,      # Disable ping to prevent timeout during heavy CPU load
+        ping_timeout=None
+    ):
+        print(f"Listening on ws://{HOST}:{PORT}")
+        await asyncio.Future()  # run forever
+
+if __name__ == "__main__":
+    asyncio.run(main())